@@ -10,9 +10,11 @@ def main():
     parser.add_argument('--interactive', type=str, default='true', help='Modo interactivo (true/false)')
     parser.add_argument('--default_width', type=int, default=100, help='Ancho predeterminado')
     parser.add_argument('--default_height', type=int, default=100, help='Alto predeterminado')
+    parser.add_argument('--stream', type=str, default='false', help='Modo continuo sin orden por firma (true/false)')
     args = parser.parse_args()
 
     interactive = args.interactive.lower() == 'true'
+    stream = args.stream.lower() == 'true'
 
     try:
         capture = SignatureCapture(
@@ -22,7 +24,7 @@ def main():
             default_width=args.default_width,
             default_height=args.default_height
         )
-        capture.capture_signature(interactive=interactive)
+        capture.capture_signature(interactive=interactive, stream=stream)
         print(json.dumps({"status": "success", "message": "Captura completada"}))
     except Exception as e:
         print(json.dumps({"status": "error", "message": str(e)}))
@@ -14,7 +14,11 @@ setup(
     install_requires=[
         "pyserial>=3.5",
         "Pillow>=9.0",
+        "numpy>=1.20",
     ],
+    extras_require={
+        "fast": ["numba>=0.56"],
+    },
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",
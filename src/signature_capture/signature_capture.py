@@ -1,9 +1,19 @@
 import serial
+import numpy as np
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageFilter
-import datetime
 import os
+import queue
+import re
+import threading
 import time
 
+try:
+    import numba
+except ImportError:  # numba es opcional; sin él las líneas de píxel se analizan con PIXEL_LINE_RE
+    numba = None
+
 class SignatureCaptureError(Exception):
     """Excepción base para errores en la captura de firmas."""
     pass
@@ -28,52 +38,161 @@ class TimeoutError(SignatureCaptureError):
     """Timeout en la lectura de datos."""
     pass
 
+# Registro binario de un píxel: x, y y color RGB565 como uint16 little-endian
+PIXEL_RECORD_DTYPE = np.dtype([('x', '<u2'), ('y', '<u2'), ('c', '<u2')])
+
+# Línea de píxel en texto: x,y,color (coordenadas decimales y color RGB565 en hexadecimal)
+PIXEL_LINE_RE = re.compile(rb'^([0-9]+),([0-9]+),([0-9A-Fa-f]+)$', re.MULTILINE)
+
+def _parse_pixel_block(buf, xs, ys, colors):
+    """Analiza un bloque ASCII de líneas x,y,color separadas por '\\n'.
+
+    `buf` es un arreglo uint8 y `xs`, `ys`, `colors` arreglos uint16 con una
+    posición por línea. Devuelve el índice de la primera línea inválida, o -1
+    si todas son válidas. Escrita para compilarse con numba.njit.
+    """
+    n = len(buf)
+    i = 0
+    line = 0
+    while i < n:
+        for field in range(3):
+            start = i
+            value = 0
+            while i < n:
+                ch = int(buf[i])
+                if 48 <= ch <= 57:
+                    digit = ch - 48
+                elif field == 2 and 65 <= ch <= 70:
+                    digit = ch - 55
+                elif field == 2 and 97 <= ch <= 102:
+                    digit = ch - 87
+                else:
+                    break
+                value = value * (16 if field == 2 else 10) + digit
+                if value > 0xFFFF:
+                    return line
+                i += 1
+            if i == start:
+                return line
+            if field == 0:
+                xs[line] = value
+            elif field == 1:
+                ys[line] = value
+            else:
+                colors[line] = value
+            if field < 2:
+                if i >= n or buf[i] != 44:  # ','
+                    return line
+                i += 1
+        if i < n:
+            if buf[i] != 10:  # '\n'
+                return line
+            i += 1
+        line += 1
+    return -1
+
+_parse_pixel_block_jit = numba.njit(cache=True)(_parse_pixel_block) if numba is not None else None
+
 class SerialConnection:
     """Clase para manejar la conexión serial con el Arduino."""
+    READ_TIMEOUT = 0.05  # Timeout de pyserial por lectura; read_line reintenta hasta su propio timeout
+    RX_BUFFER_SIZE = 65536
+    TX_BUFFER_SIZE = 4096
+
     def __init__(self, port, baud_rate):
         self.port = port
         self.baud_rate = baud_rate
         self.serial = None
+        self._is_open = False  # Estado del puerto cacheado; se actualiza en connect() y close()
+        self._rxbuf = bytearray()  # Bytes recibidos aún no consumidos por read_line/read_bytes
 
     def connect(self):
         """Establece la conexión serial."""
         try:
-            self.serial = serial.Serial(self.port, self.baud_rate, timeout=1)
+            self.serial = serial.Serial(self.port, self.baud_rate, timeout=self.READ_TIMEOUT)
+            self._rxbuf = bytearray()
+            self._configure_latency()
+            self._is_open = True
             print(f"Conexión establecida en {self.port} a {self.baud_rate} baudios.")
             return True
         except serial.SerialException as e:
             raise SerialConnectionError(f"Error: No se pudo conectar a {self.port}. Verifica que el Microcontrolador esté conectado, el puerto sea correcto y no esté en uso por otra aplicación. Detalles: {str(e)}")
 
+    def _configure_latency(self):
+        """Ajusta búferes y latencia del puerto según la plataforma."""
+        if os.name == 'nt':
+            self.serial.set_buffer_size(rx_size=self.RX_BUFFER_SIZE, tx_size=self.TX_BUFFER_SIZE)
+        else:
+            try:
+                self.serial.set_low_latency_mode(True)
+            except (AttributeError, ValueError, OSError, NotImplementedError):
+                pass  # No todos los adaptadores/controladores soportan ASYNC_LOW_LATENCY
+
     def send_command(self, command):
         """Envía un comando al Arduino."""
-        if self.serial and self.serial.is_open:
+        if self._is_open:
             try:
                 self.serial.write(command.encode())
-                print("Enviando orden de captura...")
             except serial.SerialException as e:
                 raise SerialConnectionError(f"Error al enviar comando: {str(e)}")
         else:
             raise SerialConnectionError("No hay conexión serial establecida.")
 
     def read_line(self, timeout=5):
-        """Lee una línea desde el puerto serial con timeout."""
-        start_time = time.time()
+        """Lee una línea (bytes, sin espacios finales) desde el puerto serial con timeout."""
+        if not self._is_open:
+            raise SerialConnectionError("No hay conexión serial establecida.")
+        # El reloj solo se consulta cuando una lectura no produjo ninguna línea
+        deadline = time.monotonic() + timeout
         while True:
-            if time.time() - start_time > timeout:
-                raise TimeoutError("Timeout al leer datos del serial.")
-            if self.serial and self.serial.is_open:
-                try:
-                    line = self.serial.readline().decode().strip()
+            try:
+                for raw_line in self._readlines_nonblocking():
+                    line = raw_line.strip()
                     if line:
                         return line
-                except serial.SerialException as e:
-                    raise SerialConnectionError(f"Error al leer línea: {str(e)}")
-            else:
-                raise SerialConnectionError("No hay conexión serial establecida.")
+            except serial.SerialException as e:
+                raise SerialConnectionError(f"Error al leer línea: {str(e)}")
+            if time.monotonic() > deadline:
+                raise TimeoutError("Timeout al leer datos del serial.")
+
+    def _readlines_nonblocking(self):
+        """Genera las líneas completas del búfer de recepción.
+
+        Solo lee del puerto (todo lo disponible en una llamada) cuando el búfer
+        no contiene ninguna línea completa. Las líneas no consumidas permanecen
+        en el búfer para la siguiente llamada.
+        """
+        if self._rxbuf.find(b'\n') < 0:
+            self._rxbuf += self.serial.read(max(1, self.serial.in_waiting))
+        while True:
+            end = self._rxbuf.find(b'\n')
+            if end < 0:
+                return
+            line = bytes(self._rxbuf[:end])
+            del self._rxbuf[:end + 1]
+            yield line
+
+    def read_bytes(self, size, timeout=5):
+        """Lee exactamente `size` bytes desde el puerto serial con timeout."""
+        data = self._rxbuf[:size]
+        del self._rxbuf[:size]
+        if len(data) == size:
+            return bytes(data)
+        if not self._is_open:
+            raise SerialConnectionError("No hay conexión serial establecida.")
+        deadline = time.monotonic() + timeout
+        while len(data) < size:
+            try:
+                data += self.serial.read(size - len(data))
+            except serial.SerialException as e:
+                raise SerialConnectionError(f"Error al leer bytes: {str(e)}")
+            if len(data) < size and time.monotonic() > deadline:
+                raise TimeoutError(f"Timeout al leer datos binarios del serial ({len(data)} de {size} bytes).")
+        return bytes(data)
 
     def close(self):
         """Cierra la conexión serial."""
-        if self.serial and self.serial.is_open:
+        if self._is_open:
             try:
                 self.serial.close()
                 print("Puerto serial cerrado.")
@@ -81,61 +200,162 @@ class SerialConnection:
                 raise SerialConnectionError(f"Error al cerrar el puerto: {str(e)}")
             finally:
                 self.serial = None
+                self._is_open = False
+                self._rxbuf = bytearray()
+
+def _write_image(image, filename, save_options):
+    """Guarda `image` en `filename`; cualquier fallo se reporta como SaveImageError."""
+    try:
+        image.save(filename, **save_options)
+        print(f"Firma guardada en: {filename}")
+    except OSError as e:
+        raise SaveImageError(f"Error al guardar la imagen en '{filename}': {str(e)}. Verifica permisos de escritura en la carpeta.")
+    except Exception as e:
+        raise SaveImageError(f"Error al guardar la imagen en '{filename}': {str(e)}")
+
+class AsyncImageWriter:
+    """Guarda imágenes en disco desde un hilo en segundo plano."""
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._errors = []
+        self._thread = None  # Se inicia con el primer submit() y se detiene con close()
+
+    def submit(self, image, filename, **save_options):
+        """Encola una imagen para guardarla en `filename` con las opciones de `Image.save`."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="AsyncImageWriter", daemon=True)
+            self._thread.start()
+        self._queue.put((image, filename, save_options))
+
+    def flush(self):
+        """Espera a que se guarden las imágenes encoladas y propaga el primer error."""
+        self._queue.join()
+        if self._errors:
+            errors, self._errors = self._errors, []
+            raise errors[0]
+
+    def close(self):
+        """Guarda lo pendiente, detiene el hilo de escritura y propaga el primer error."""
+        if self._thread is not None:
+            self._queue.put(None)  # Centinela de parada
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        """Bucle del hilo de escritura; solo termina al recibir el centinela de close()."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            image, filename, save_options = item
+            try:
+                _write_image(image, filename, save_options)
+            except SaveImageError as e:
+                self._errors.append(e)
+            finally:
+                self._queue.task_done()
 
 class SignatureProcessor:
     """Clase para procesar y guardar la firma como imagen."""
+    BLUR_MARGIN = 2  # Píxeles alrededor del trazo que alcanza el GaussianBlur(radius=0.5)
+    # Compresión zlib rápida: las firmas son pequeñas y el nivel por defecto (6) es mucho más lento
+    PNG_SAVE_OPTIONS = {"format": "PNG", "compress_level": 1, "optimize": False}
+
     def __init__(self, save_folder="firmas"):
         self.save_folder = save_folder
+        self._folder_path = os.fspath(save_folder)
         self._ensure_folder_exists()
+        self._writer = AsyncImageWriter()
+        self._async_saving = False  # Solo se activa durante una sesión de SignatureCapture
 
     def _ensure_folder_exists(self):
         """Crea la carpeta de guardado si no existe."""
         try:
-            if not os.path.exists(self.save_folder):
-                os.makedirs(self.save_folder)
+            os.makedirs(self.save_folder, exist_ok=True)
         except OSError as e:
             raise SaveImageError(f"Error al crear la carpeta de guardado '{self.save_folder}': {str(e)}")
 
     def process_pixel_data(self, width, height, pixel_data, serial_number):
-        """Procesa los datos de píxeles y guarda la imagen."""
-        if not pixel_data or width <= 0 or height <= 0:
+        """Procesa los datos de píxeles y guarda la imagen.
+
+        Tras `start_async_saving()` el guardado solo se encola; en ese caso los
+        errores se reciben con `flush()` o `close()`.
+        """
+        if len(pixel_data) == 0 or width <= 0 or height <= 0:
             raise InvalidDataError("Datos de píxeles inválidos: ancho, alto o datos vacíos.")
         
-        img = Image.new('RGB', (width, height), "black")
-        pixels = img.load()
-
-        non_black_pixels = 0
-        for x, y, color in pixel_data:
-            if 0 <= x < width and 0 <= y < height:
-                r = ((color >> 11) & 0x1F) * 255 // 31
-                g = ((color >> 5) & 0x3F) * 255 // 63
-                b = (color & 0x1F) * 255 // 31
-                pixels[x, y] = (r, g, b)
-                if (r, g, b) != (0, 0, 0):
-                    non_black_pixels += 1
-            else:
-                raise InvalidDataError(f"Píxel fuera de rango: x={x}, y={y} con ancho={width}, alto={height}")
+        try:
+            data = np.asarray(pixel_data, dtype=np.int64)
+        except (ValueError, TypeError, OverflowError):
+            raise InvalidDataError("Datos de píxeles inválidos: se esperaban tuplas numéricas (x, y, color).")
+        if not (data.ndim == 2 and data.shape[1] == 3):
+            raise InvalidDataError(f"Datos de píxeles inválidos: se esperaban filas (x, y, color), forma recibida {data.shape}.")
+        self.process_pixel_columns(width, height, data[:, 0], data[:, 1], data[:, 2], serial_number)
+
+    def process_pixel_columns(self, width, height, xs, ys, colors, serial_number):
+        """Procesa los píxeles recibidos como columnas separadas (x, y, color) y guarda la imagen.
+
+        El guardado es síncrono salvo tras `start_async_saving()`, igual que en `process_pixel_data`.
+        """
+        xs = np.asarray(xs)
+        ys = np.asarray(ys)
+        colors = np.asarray(colors)
+        if not xs.ndim == ys.ndim == colors.ndim == 1:
+            raise InvalidDataError("Columnas de píxeles inválidas: se esperaban arreglos de una dimensión.")
+        if len(xs) == 0 or width <= 0 or height <= 0:
+            raise InvalidDataError("Datos de píxeles inválidos: ancho, alto o datos vacíos.")
+        if not len(xs) == len(ys) == len(colors):
+            raise InvalidDataError("Columnas de píxeles con longitudes distintas.")
+        if colors.min() < 0 or colors.max() > 0xFFFF:
+            raise InvalidDataError("Color fuera de rango: se esperaba un valor RGB565 entre 0 y FFFF.")
+        colors = colors.astype(np.uint16, copy=False)
+
+        valid = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        if not valid.all():
+            i = int(np.argmin(valid))
+            raise InvalidDataError(f"Píxel fuera de rango: x={xs[i]}, y={ys[i]} con ancho={width}, alto={height}")
+
+        # Pillow decodifica el búfer RGB565 directamente en C (modo raw 'BGR;16')
+        raw = np.zeros((height, width), dtype='<u2')
+        raw[ys, xs] = colors
 
-        if non_black_pixels == 0:
+        if not raw.any():
             raise EmptySignatureError("Firma vacía detectada: todos los píxeles son negros.")
 
-        img = img.filter(ImageFilter.GaussianBlur(radius=0.5))
-        scaled_img = img.resize((width * 2, height * 2), Image.Resampling.LANCZOS)
-        
-        try:
-            self._save_image(scaled_img, serial_number)
-        except SaveImageError as e:
-            raise SaveImageError(f"Error al guardar la imagen: {str(e)}")
+        # Solo se decodifica y difumina el recuadro que contiene el trazo; el resto queda negro
+        rows = np.flatnonzero(raw.any(axis=1))
+        cols = np.flatnonzero(raw.any(axis=0))
+        y0, y1 = max(rows[0] - self.BLUR_MARGIN, 0), min(rows[-1] + 1 + self.BLUR_MARGIN, height)
+        x0, x1 = max(cols[0] - self.BLUR_MARGIN, 0), min(cols[-1] + 1 + self.BLUR_MARGIN, width)
+        crop = Image.frombytes('RGB', (x1 - x0, y1 - y0), raw[y0:y1, x0:x1].tobytes(), 'raw', 'BGR;16')
+        img = Image.new('RGB', (width, height), "black")
+        img.paste(crop.filter(ImageFilter.GaussianBlur(radius=0.5)), (int(x0), int(y0)))
+        scaled_img = img.resize((width * 2, height * 2), Image.Resampling.BILINEAR)
+        self._save_image(scaled_img, serial_number)
 
     def _save_image(self, image, serial_number):
-        """Guarda la imagen con un nombre basado en el número de serie y la fecha."""
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = os.path.join(self.save_folder, f"firma_{serial_number}_{timestamp}.png")
-        try:
-            image.save(filename)
-            print(f"Firma guardada en: {filename}")
-        except OSError as e:
-            raise SaveImageError(f"Error al guardar la imagen en '{filename}': {str(e)}. Verifica permisos de escritura en la carpeta.")
+        """Guarda (o encola, en modo asíncrono) la imagen con un nombre basado en el número de serie y la fecha."""
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        filename = f"{self._folder_path}{os.sep}firma_{serial_number}_{timestamp}.png"
+        if self._async_saving:
+            self._writer.submit(image, filename, **self.PNG_SAVE_OPTIONS)
+        else:
+            _write_image(image, filename, self.PNG_SAVE_OPTIONS)
+
+    def start_async_saving(self):
+        """Pasa a guardar las imágenes en segundo plano hasta que se llame a `close()`."""
+        self._async_saving = True
+
+    def flush(self):
+        """Espera a que terminen de guardarse las imágenes pendientes."""
+        self._writer.flush()
+
+    def close(self):
+        """Guarda las imágenes pendientes, detiene el hilo de escritura y vuelve al guardado síncrono."""
+        self._async_saving = False
+        self._writer.close()
 
 class SignatureCapture:
     """Clase principal para coordinar la captura de firmas."""
@@ -144,9 +364,16 @@ class SignatureCapture:
         self.signature_processor = SignatureProcessor(save_folder)
         self.default_width = default_width
         self.default_height = default_height
+        self._executor = None
+        self._pending = []
 
-    def capture_signature(self, interactive=True):
-        """Captura una firma desde el Arduino y la procesa."""
+    def capture_signature(self, interactive=True, stream=False):
+        """Captura una firma desde el Arduino y la procesa.
+
+        Con `stream=True` el microcontrolador captura por su cuenta cada vez que se
+        firma en la tableta y se leen las firmas una tras otra hasta Ctrl+C; en ese
+        modo no se pide confirmación, por lo que `interactive` no se usa.
+        """
         try:
             if not self.serial_conn.connect():
                 raise SerialConnectionError("No se pudo establecer la conexión serial.")
@@ -154,19 +381,28 @@ class SignatureCapture:
             print(str(e))
             return
 
+        # El procesamiento de cada firma corre en segundo plano mientras se captura la siguiente
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.signature_processor.start_async_saving()
         try:
-            while True:
-                if interactive:
-                    user_input = input("Presiona Enter para capturar una firma (o 'salir' para terminar): ")
-                    if user_input.lower() == "salir":
+            if stream:
+                self._stream_signatures()
+            else:
+                while True:
+                    if interactive:
+                        user_input = input("Presiona Enter para capturar una firma (o 'salir' para terminar): ")
+                        if user_input.lower() == "salir":
+                            break
+                    else:
+                        self._request_capture()
+                        self._capture_once()
                         break
-                else:
-                    self.serial_conn.send_command("CAPTURE_SIGNATURE\n")
+
+                    self._request_capture()
                     self._capture_once()
-                    break
+                    self._collect_processed()
 
-                self.serial_conn.send_command("CAPTURE_SIGNATURE\n")
-                self._capture_once()
+            self._collect_processed(wait=True)
 
         except TimeoutError as e:
             print(f"Timeout durante la captura: {str(e)}")
@@ -179,15 +415,114 @@ class SignatureCapture:
         except Exception as e:
             print(f"Error inesperado durante la captura: {str(e)}")
         finally:
+            if stream:
+                try:
+                    self.serial_conn.send_command("STREAM_OFF\n")
+                except SerialConnectionError as e:
+                    print(f"Error al desactivar el modo continuo: {str(e)}")
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            for serial_number, future in self._pending:
+                if future.exception() is not None:
+                    print(f"Error al procesar la firma {serial_number}: {str(future.exception())}")
+            self._pending = []
+            try:
+                self.signature_processor.close()
+            except SaveImageError as e:
+                print(f"Error al guardar la firma: {str(e)}")
             try:
                 self.serial_conn.close()
             except SerialConnectionError as e:
                 print(f"Error al cerrar la conexión: {str(e)}")
 
+    def _request_capture(self):
+        """Envía la orden de captura de una firma."""
+        self.serial_conn.send_command("CAPTURE_SIGNATURE\n")
+        print("Enviando orden de captura...")
+
+    def _stream_signatures(self):
+        """Activa el modo continuo y lee firmas consecutivas sin enviar una orden por cada una.
+
+        Un timeout solo indica que nadie está firmando; una firma vacía o con datos
+        inválidos se descarta y se sigue leyendo la siguiente.
+        """
+        self.serial_conn.send_command("STREAM_ON\n")
+        print("Modo continuo activo: firma en la tableta (Ctrl+C para terminar).")
+        while True:
+            try:
+                self._capture_once()
+                self._collect_processed()
+            except TimeoutError:
+                continue
+            except (InvalidDataError, EmptySignatureError) as e:
+                print(f"Firma descartada: {str(e)}")
+
+    def _submit_processing(self, width, height, xs, ys, colors, serial_number):
+        """Encola el procesamiento de una firma; sin sesión activa lo ejecuta directamente."""
+        if self._executor is None:
+            self.signature_processor.process_pixel_columns(width, height, xs, ys, colors, serial_number)
+            return
+        future = self._executor.submit(self.signature_processor.process_pixel_columns, width, height, xs, ys, colors, serial_number)
+        self._pending.append((serial_number, future))
+
+    def _collect_processed(self, wait=False):
+        """Recoge las firmas ya procesadas; informa de cada fallo y propaga el primero.
+
+        El error propagado conserva su tipo e indica el número de serie de la firma.
+        """
+        first_error = None
+        for entry in list(self._pending):
+            serial_number, future = entry
+            if not (wait or future.done()):
+                continue
+            error = future.exception()
+            self._pending.remove(entry)
+            if error is None:
+                continue
+            if first_error is None:
+                first_error = (serial_number, error)
+            else:
+                print(f"Error al procesar la firma {serial_number}: {str(error)}")
+        if first_error is not None:
+            serial_number, error = first_error
+            message = f"Firma {serial_number}: {str(error)}"
+            if isinstance(error, SignatureCaptureError):
+                raise type(error)(message) from error
+            raise SignatureCaptureError(message) from error
+
+    @staticmethod
+    def _parse_pixel_lines(pixel_lines, xs, ys, colors):
+        """Analiza en bloque las líneas de píxel x,y,color y las añade a las columnas."""
+        if not pixel_lines:
+            return
+        if _parse_pixel_block_jit is not None:
+            block = np.frombuffer(b"\n".join(pixel_lines), dtype=np.uint8)
+            parsed = np.empty((3, len(pixel_lines)), dtype=np.uint16)
+            bad_index = _parse_pixel_block_jit(block, parsed[0], parsed[1], parsed[2])
+            if bad_index >= 0:
+                raise InvalidDataError(f"Formato de píxel inválido: '{pixel_lines[bad_index].decode(errors='replace')}'.")
+            xs.frombytes(parsed[0].tobytes())
+            ys.frombytes(parsed[1].tobytes())
+            colors.frombytes(parsed[2].tobytes())
+            return
+        matches = PIXEL_LINE_RE.findall(b"\n".join(pixel_lines))
+        if len(matches) != len(pixel_lines):
+            bad_line = next(line for line in pixel_lines if not PIXEL_LINE_RE.fullmatch(line))
+            raise InvalidDataError(f"Formato de píxel inválido: '{bad_line.decode(errors='replace')}'.")
+        for x, y, color in matches:
+            x, y, color = int(x), int(y), int(color, 16)
+            if x > 0xFFFF or y > 0xFFFF or color > 0xFFFF:
+                raise InvalidDataError(f"Píxel fuera de rango: x={x}, y={y}, color={color:X}")
+            xs.append(x)
+            ys.append(y)
+            colors.append(color)
+
     def _capture_once(self):
         """Captura una única firma."""
         capturing = False
-        pixel_data = []
+        # Columnas separadas (SoA): x, y y color RGB565 como uint16 contiguos
+        xs, ys, colors = array('H'), array('H'), array('H')
+        pixel_lines = []  # Líneas de píxel en texto pendientes de analizar en bloque
         width = self.default_width
         height = self.default_height
         serial_number = ""
@@ -196,25 +531,26 @@ class SignatureCapture:
             while True:
                 line = self.serial_conn.read_line(timeout=10)  # Timeout de 10 segundos por línea
                 if line:
-                    if line.startswith("START_SAVING:"):
+                    if line.startswith(b"START_SAVING:"):
                         capturing = True
-                        pixel_data = []
-                        serial_number = line.replace("START_SAVING:", "")
+                        xs, ys, colors = array('H'), array('H'), array('H')
+                        pixel_lines = []
+                        serial_number = line[len(b"START_SAVING:"):].decode(errors='replace')
                         if not serial_number:
                             raise InvalidDataError("Número de serie vacío recibido.")
                         print(f"Capturando firma con serial: {serial_number}")
-                    elif line == "END_SAVING" and capturing:
+                    elif line == b"END_SAVING" and capturing:
                         capturing = False
+                        self._parse_pixel_lines(pixel_lines, xs, ys, colors)
                         if width <= 0 or height <= 0:
                             raise InvalidDataError("Dimensiones inválidas: ancho o alto <= 0.")
-                        if not pixel_data:
+                        if len(xs) == 0:
                             raise EmptySignatureError("No se recibieron datos de píxeles.")
-                        self.signature_processor.process_pixel_data(width, height, pixel_data, serial_number)
-                        pixel_data = []
+                        self._submit_processing(width, height, xs, ys, colors, serial_number)
                         break
                     elif capturing:
-                        if line.startswith("DIM:"):
-                            dims = line[4:].split(",")
+                        if line.startswith(b"DIM:"):
+                            dims = line[4:].split(b",")
                             if len(dims) != 2:
                                 raise InvalidDataError("Formato de dimensiones inválido.")
                             try:
@@ -224,17 +560,26 @@ class SignatureCapture:
                                     raise InvalidDataError("Dimensiones negativas o cero.")
                             except ValueError:
                                 raise InvalidDataError("Valores de dimensiones no numéricos.")
-                        else:
-                            parts = line.split(",")
-                            if len(parts) != 3:
-                                raise InvalidDataError("Formato de píxel inválido.")
+                        elif line.startswith(b"BIN:"):
+                            # Bloque binario: BIN:<n> seguido de n registros de 6 bytes (x, y, color)
                             try:
-                                x = int(parts[0])
-                                y = int(parts[1])
-                                color = int(parts[2], 16)
+                                count = int(line[4:])
                             except ValueError:
-                                raise InvalidDataError("Valores de píxel no válidos (no numéricos o hexadecimal inválido).")
-                            pixel_data.append((x, y, color))
+                                raise InvalidDataError("Cantidad de píxeles binarios no numérica.")
+                            if count < 0:
+                                raise InvalidDataError("Cantidad de píxeles binarios negativa.")
+                            if count > width * height:
+                                # Un cuadro no puede tener más píxeles distintos que ancho*alto
+                                raise InvalidDataError(f"Cantidad de píxeles binarios ({count}) mayor que ancho*alto ({width * height}).")
+                            self._parse_pixel_lines(pixel_lines, xs, ys, colors)
+                            pixel_lines = []
+                            raw = self.serial_conn.read_bytes(count * PIXEL_RECORD_DTYPE.itemsize, timeout=10)
+                            records = np.frombuffer(raw, dtype=PIXEL_RECORD_DTYPE)
+                            xs.frombytes(records['x'].astype(np.uint16).tobytes())
+                            ys.frombytes(records['y'].astype(np.uint16).tobytes())
+                            colors.frombytes(records['c'].astype(np.uint16).tobytes())
+                        else:
+                            pixel_lines.append(line)
                 else:
                     raise TimeoutError("No se recibió respuesta del microcontrolador después de enviar el comando.")
         except TimeoutError as e:
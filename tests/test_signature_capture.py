@@ -1,8 +1,12 @@
 import unittest
 import os
+import struct
+import serial
+import numpy as np
+from concurrent.futures import Future
 from unittest.mock import Mock, patch, MagicMock
-from src.signature_capture.signature_capture import SerialConnection, SignatureProcessor, SignatureCapture
-from PIL import Image
+from src.signature_capture.signature_capture import SerialConnection, SignatureProcessor, SignatureCapture, InvalidDataError, EmptySignatureError, SerialConnectionError, SaveImageError, TimeoutError, _parse_pixel_block
+from PIL import Image, ImageFilter
 
 class TestSerialConnection(unittest.TestCase):
     def setUp(self):
@@ -15,16 +19,70 @@ class TestSerialConnection(unittest.TestCase):
         mock_serial.return_value = Mock(is_open=True)
         result = self.serial_conn.connect()
         self.assertTrue(result)
-        mock_serial.assert_called_once_with("COM8", 115200, timeout=1)
+        mock_serial.assert_called_once_with("COM8", 115200, timeout=SerialConnection.READ_TIMEOUT)
 
     @patch("serial.Serial")
     def test_connect_failure(self, mock_serial):
         """Prueba que connect() maneja correctamente un fallo de conexión."""
         mock_serial.side_effect = serial.SerialException("Error de conexión")
-        result = self.serial_conn.connect()
-        self.assertFalse(result)
+        with self.assertRaises(SerialConnectionError):
+            self.serial_conn.connect()
         self.assertIsNone(self.serial_conn.serial)  # Verifica que serial sea None
 
+    @patch("os.name", "posix")
+    @patch("serial.Serial")
+    def test_connect_enables_low_latency(self, mock_serial):
+        """Prueba que connect() activa el modo de baja latencia en POSIX."""
+        mock_serial.return_value = Mock(is_open=True)
+        self.serial_conn.connect()
+        mock_serial.return_value.set_low_latency_mode.assert_called_once_with(True)
+
+    @patch("os.name", "posix")
+    @patch("serial.Serial")
+    def test_connect_low_latency_unsupported(self, mock_serial):
+        """Prueba que connect() tolera adaptadores sin modo de baja latencia."""
+        mock_serial.return_value = Mock(is_open=True)
+        mock_serial.return_value.set_low_latency_mode.side_effect = ValueError("no soportado")
+        self.assertTrue(self.serial_conn.connect())
+
+    def test_read_line_buffers_bulk_reads(self):
+        """Prueba que read_line reparte en líneas un único bloque leído del puerto."""
+        self.serial_conn.serial = Mock(is_open=True, in_waiting=24)
+        self.serial_conn._is_open = True
+        self.serial_conn.serial.read.return_value = b"START_SAVING:A\r\nDIM:1,1\r\nEND"
+        self.assertEqual(self.serial_conn.read_line(), b"START_SAVING:A")
+        self.assertEqual(self.serial_conn.read_line(), b"DIM:1,1")
+        self.serial_conn.serial.read.assert_called_once_with(24)
+        self.serial_conn.serial.read.return_value = b"_SAVING\n"
+        self.assertEqual(self.serial_conn.read_line(), b"END_SAVING")
+
+    def test_read_line_timeout(self):
+        """Prueba que read_line lanza TimeoutError si no llega ninguna línea antes del plazo."""
+        self.serial_conn.serial = Mock(is_open=True, in_waiting=0)
+        self.serial_conn._is_open = True
+        self.serial_conn.serial.read.return_value = b""
+        with self.assertRaises(TimeoutError):
+            self.serial_conn.read_line(timeout=0)
+
+    def test_read_bytes_consumes_buffered_data_first(self):
+        """Prueba que read_bytes entrega primero los bytes ya recibidos en el búfer."""
+        self.serial_conn.serial = Mock(is_open=True, in_waiting=0)
+        self.serial_conn._is_open = True
+        self.serial_conn.serial.read.return_value = b"BIN:1\n\x01\x00"
+        self.assertEqual(self.serial_conn.read_line(), b"BIN:1")
+        self.serial_conn.serial.read.return_value = b"\x02\x00\x03\x00"
+        self.assertEqual(self.serial_conn.read_bytes(6), b"\x01\x00\x02\x00\x03\x00")
+
+    @patch("serial.Serial")
+    def test_close_resets_open_flag(self, mock_serial):
+        """Prueba que close() marca la conexión como cerrada y send_command falla después."""
+        mock_serial.return_value = Mock(is_open=True)
+        self.serial_conn.connect()
+        self.serial_conn.close()
+        mock_serial.return_value.close.assert_called_once()
+        with self.assertRaises(SerialConnectionError):
+            self.serial_conn.send_command("CAPTURE_SIGNATURE\n")
+
     def test_close_without_connection(self):
         """Prueba que close() no falla si no hay conexión."""
         self.serial_conn.close()  # No debería lanzar excepción
@@ -36,6 +94,7 @@ class TestSignatureProcessor(unittest.TestCase):
 
     def tearDown(self):
         """Elimina la carpeta de prueba después de cada prueba."""
+        self.processor.close()
         if os.path.exists("test_firmas"):
             for file in os.listdir("test_firmas"):
                 os.remove(os.path.join("test_firmas", file))
@@ -45,20 +104,96 @@ class TestSignatureProcessor(unittest.TestCase):
         """Prueba que la carpeta de guardado se crea si no existe."""
         self.assertTrue(os.path.exists("test_firmas"))
 
-    @patch("PIL.Image.new")
     @patch("PIL.Image.Image.save")
-    def test_process_pixel_data(self, mock_save, mock_image):
+    def test_process_pixel_data(self, mock_save):
         """Prueba que process_pixel_data procesa y guarda la imagen correctamente."""
-        # Crear un mock que simule un objeto Image con load()
-        mock_image_instance = Mock()
-        mock_load = Mock()
-        mock_image_instance.load.return_value = mock_load
-        mock_image.return_value = mock_image_instance
-
         pixel_data = [(0, 0, 0xF800)]  # Ejemplo de píxel rojo
         self.processor.process_pixel_data(width=1, height=1, pixel_data=pixel_data, serial_number="TEST123")
-        mock_load.__setitem__.assert_called()  # Verifica que se asignó un píxel
         mock_save.assert_called_once()
+        self.assertEqual(mock_save.call_args[1], {"format": "PNG", "compress_level": 1, "optimize": False})
+
+    def test_process_pixel_data_writes_file_before_returning(self):
+        """Prueba que fuera de una sesión la imagen está en disco al volver de process_pixel_data."""
+        self.processor.process_pixel_data(width=1, height=1, pixel_data=[(0, 0, 0xF800)], serial_number="TEST123")
+        self.assertEqual(len(os.listdir("test_firmas")), 1)
+        self.assertIsNone(self.processor._writer._thread)
+
+    @patch("PIL.Image.Image.save", side_effect=OSError("disco lleno"))
+    def test_process_pixel_data_save_error(self, mock_save):
+        """Prueba que un fallo del guardado síncrono se lanza como SaveImageError."""
+        with self.assertRaises(SaveImageError):
+            self.processor.process_pixel_data(width=1, height=1, pixel_data=[(0, 0, 0xF800)], serial_number="TEST123")
+
+    @patch("PIL.Image.Image.save", side_effect=OSError("disco lleno"))
+    def test_flush_reports_save_error(self, mock_save):
+        """Prueba que flush() propaga los errores del guardado en segundo plano."""
+        self.processor.start_async_saving()
+        self.processor.process_pixel_data(width=1, height=1, pixel_data=[(0, 0, 0xF800)], serial_number="TEST123")
+        with self.assertRaises(SaveImageError):
+            self.processor.flush()
+
+    @patch("PIL.Image.Image.save", side_effect=[ValueError("embedded null byte"), None])
+    def test_writer_survives_unexpected_save_error(self, mock_save):
+        """Prueba que un error no OSError se reporta como SaveImageError y el hilo sigue guardando."""
+        self.processor.start_async_saving()
+        self.processor.process_pixel_data(width=1, height=1, pixel_data=[(0, 0, 0xF800)], serial_number="A\x00")
+        with self.assertRaises(SaveImageError):
+            self.processor.flush()
+        self.processor.process_pixel_data(width=1, height=1, pixel_data=[(0, 0, 0xF800)], serial_number="B")
+        self.processor.flush()
+        self.assertEqual(mock_save.call_count, 2)
+
+    @patch("PIL.Image.Image.save")
+    def test_close_stops_writer_thread(self, mock_save):
+        """Prueba que close() guarda lo pendiente y detiene el hilo de escritura."""
+        self.assertIsNone(self.processor._writer._thread)
+        self.processor.start_async_saving()
+        self.processor.process_pixel_data(width=1, height=1, pixel_data=[(0, 0, 0xF800)], serial_number="TEST123")
+        thread = self.processor._writer._thread
+        self.processor.close()
+        mock_save.assert_called_once()
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(self.processor._writer._thread)
+
+    @patch.object(SignatureProcessor, "_save_image")
+    def test_process_pixel_data_rgb565_expansion(self, mock_save_image):
+        """Prueba que la conversión RGB565 -> RGB888 escala cada canal a 0-255."""
+        self.processor.process_pixel_data(width=1, height=1, pixel_data=[(0, 0, 0x8410)], serial_number="TEST123")
+        image = mock_save_image.call_args[0][0]
+        self.assertEqual(image.getpixel((0, 0)), (131, 129, 131))
+
+    @patch.object(SignatureProcessor, "_save_image")
+    def test_process_pixel_data_blurs_bounding_box(self, mock_save_image):
+        """Prueba que difuminar solo el recuadro del trazo equivale a difuminar la imagen completa."""
+        pixel_data = [(10, 5, 0xFFFF), (11, 6, 0xF800), (12, 6, 0x07E0), (30, 20, 0x001F)]
+        self.processor.process_pixel_data(width=40, height=30, pixel_data=pixel_data, serial_number="TEST123")
+        full = Image.new("RGB", (40, 30), "black")
+        full.putpixel((10, 5), (255, 255, 255))
+        full.putpixel((11, 6), (255, 0, 0))
+        full.putpixel((12, 6), (0, 255, 0))
+        full.putpixel((30, 20), (0, 0, 255))
+        full = full.filter(ImageFilter.GaussianBlur(radius=0.5)).resize((80, 60), Image.Resampling.BILINEAR)
+        self.assertEqual(mock_save_image.call_args[0][0].tobytes(), full.tobytes())
+
+    def test_process_pixel_data_out_of_range(self):
+        """Prueba que un píxel fuera de las dimensiones lanza InvalidDataError."""
+        with self.assertRaises(InvalidDataError):
+            self.processor.process_pixel_data(width=2, height=2, pixel_data=[(0, 0, 0xF800), (2, 0, 0xF800)], serial_number="TEST123")
+
+    def test_process_pixel_data_malformed_rows(self):
+        """Prueba que filas sin exactamente (x, y, color) se rechazan en vez de reagruparse."""
+        with self.assertRaises(InvalidDataError):
+            self.processor.process_pixel_data(width=2, height=2, pixel_data=[(0, 0), (1, 1), (0, 1)], serial_number="TEST123")
+
+    def test_process_pixel_data_color_out_of_range(self):
+        """Prueba que un color mayor que 0xFFFF se rechaza en vez de truncarse."""
+        with self.assertRaises(InvalidDataError):
+            self.processor.process_pixel_data(width=2, height=2, pixel_data=[(0, 0, 0x1F800)], serial_number="TEST123")
+
+    def test_process_pixel_data_all_black(self):
+        """Prueba que una firma con todos los píxeles negros lanza EmptySignatureError."""
+        with self.assertRaises(EmptySignatureError):
+            self.processor.process_pixel_data(width=2, height=2, pixel_data=[(0, 0, 0x0000), (1, 1, 0x0000)], serial_number="TEST123")
 
 class TestSignatureCapture(unittest.TestCase):
     def setUp(self):
@@ -78,10 +213,10 @@ class TestSignatureCapture(unittest.TestCase):
     def test_capture_signature_interactive(self, mock_read_line, mock_send_command, mock_connect):
         """Prueba la captura interactiva con entrada simulada."""
         mock_read_line.side_effect = [
-            "START_SAVING:TEST123",
-            "DIM:1,1",
-            "0,0,F800",
-            "END_SAVING"
+            b"START_SAVING:TEST123",
+            b"DIM:1,1",
+            b"0,0,F800",
+            b"END_SAVING"
         ]
         mock_send_command.return_value = None
         with patch("builtins.input", side_effect=["", "salir"]):
@@ -95,15 +230,152 @@ class TestSignatureCapture(unittest.TestCase):
     def test_capture_signature_non_interactive(self, mock_read_line, mock_send_command, mock_connect):
         """Prueba la captura no interactiva."""
         mock_read_line.side_effect = [
-            "START_SAVING:TEST123",
-            "DIM:1,1",
-            "0,0,F800",
-            "END_SAVING"
+            b"START_SAVING:TEST123",
+            b"DIM:1,1",
+            b"0,0,F800",
+            b"END_SAVING"
         ]
         mock_send_command.return_value = None
         self.capture.capture_signature(interactive=False)
         mock_connect.assert_called_once()
         mock_send_command.assert_called()
 
+    @patch.object(SignatureProcessor, "process_pixel_columns")
+    @patch.object(SerialConnection, "close")
+    @patch.object(SerialConnection, "connect", return_value=True)
+    @patch.object(SerialConnection, "send_command")
+    @patch.object(SerialConnection, "read_line")
+    def test_capture_signature_processes_in_background(self, mock_read_line, mock_send_command, mock_connect, mock_close, mock_process):
+        """Prueba que cada firma capturada se procesa en segundo plano y se espera al cerrar."""
+        mock_read_line.side_effect = [
+            b"START_SAVING:A", b"DIM:1,1", b"0,0,F800", b"END_SAVING",
+            b"START_SAVING:B", b"DIM:1,1", b"0,0,07E0", b"END_SAVING"
+        ]
+        with patch("builtins.input", side_effect=["", "", "salir"]):
+            self.capture.capture_signature(interactive=True)
+        self.assertEqual([c[0][5] for c in mock_process.call_args_list], ["A", "B"])
+        self.assertIsNone(self.capture._executor)
+        self.assertEqual(self.capture._pending, [])
+
+    @patch.object(SignatureProcessor, "process_pixel_columns")
+    @patch.object(SerialConnection, "close")
+    @patch.object(SerialConnection, "connect", return_value=True)
+    @patch.object(SerialConnection, "send_command")
+    @patch.object(SerialConnection, "read_line")
+    def test_capture_signature_stream_skips_bad_frames(self, mock_read_line, mock_send_command, mock_connect, mock_close, mock_process):
+        """Prueba que el modo continuo descarta firmas inválidas o vacías y sigue leyendo."""
+        mock_read_line.side_effect = [
+            b"START_SAVING:A", b"DIM:1,1", b"0,0", b"END_SAVING",
+            b"START_SAVING:B", b"DIM:1,1", b"END_SAVING",
+            b"START_SAVING:C", b"DIM:1,1", b"0,0,F800", b"END_SAVING",
+            KeyboardInterrupt()
+        ]
+        with patch("builtins.print") as mock_print:
+            self.capture.capture_signature(stream=True)
+        self.assertEqual([c[0][5] for c in mock_process.call_args_list], ["C"])
+        discarded = [c for c in mock_print.call_args_list if c[0][0].startswith("Firma descartada")]
+        self.assertEqual(len(discarded), 2)
+        self.assertEqual([c[0][0] for c in mock_send_command.call_args_list], ["STREAM_ON\n", "STREAM_OFF\n"])
+
+    def test_collect_processed_reports_every_failure(self):
+        """Prueba que _collect_processed propaga el primer fallo e informa de los demás."""
+        first, second = Future(), Future()
+        first.set_exception(EmptySignatureError("primera"))
+        second.set_exception(InvalidDataError("segunda"))
+        self.capture._pending = [("A", first), ("B", second)]
+        with patch("builtins.print") as mock_print:
+            with self.assertRaisesRegex(EmptySignatureError, "^Firma A: primera$"):
+                self.capture._collect_processed()
+        mock_print.assert_called_once_with("Error al procesar la firma B: segunda")
+        self.assertEqual(self.capture._pending, [])
+
+    @patch.object(SignatureProcessor, "process_pixel_columns")
+    @patch.object(SerialConnection, "close")
+    @patch.object(SerialConnection, "connect", return_value=True)
+    @patch.object(SerialConnection, "send_command")
+    @patch.object(SerialConnection, "read_line")
+    def test_capture_signature_stream(self, mock_read_line, mock_send_command, mock_connect, mock_close, mock_process):
+        """Prueba que el modo continuo envía STREAM_ON/STREAM_OFF una sola vez y lee firmas seguidas."""
+        mock_read_line.side_effect = [
+            b"START_SAVING:A", b"DIM:1,1", b"0,0,F800", b"END_SAVING",
+            b"START_SAVING:B", b"DIM:1,1", b"0,0,07E0", b"END_SAVING",
+            KeyboardInterrupt()
+        ]
+        self.capture.capture_signature(interactive=False, stream=True)
+        self.assertEqual([c[0][0] for c in mock_send_command.call_args_list], ["STREAM_ON\n", "STREAM_OFF\n"])
+        self.assertEqual([c[0][5] for c in mock_process.call_args_list], ["A", "B"])
+
+    @patch.object(SignatureProcessor, "process_pixel_columns")
+    @patch.object(SerialConnection, "read_line")
+    def test_capture_once_pixel_columns(self, mock_read_line, mock_process):
+        """Prueba que los píxeles de texto se acumulan en columnas separadas x, y, color."""
+        mock_read_line.side_effect = [
+            b"START_SAVING:TEST123", b"DIM:2,2", b"0,0,F800", b"1,0,07E0", b"1,1,001F", b"END_SAVING"
+        ]
+        self.capture._capture_once()
+        width, height, xs, ys, colors, serial_number = mock_process.call_args[0]
+        self.assertEqual((list(xs), list(ys), list(colors)), ([0, 1, 1], [0, 0, 1], [0xF800, 0x07E0, 0x001F]))
+
+    @patch.object(SerialConnection, "read_bytes")
+    @patch.object(SerialConnection, "read_line")
+    def test_capture_once_binary_count_too_large(self, mock_read_line, mock_read_bytes):
+        """Prueba que un BIN:<n> mayor que ancho*alto se rechaza sin leer del puerto."""
+        mock_read_line.side_effect = [b"START_SAVING:TEST123", b"DIM:2,2", b"BIN:4000000000", b"END_SAVING"]
+        with self.assertRaises(InvalidDataError):
+            self.capture._capture_once()
+        mock_read_bytes.assert_not_called()
+
+    @patch("src.signature_capture.signature_capture._parse_pixel_block_jit", None)
+    @patch.object(SignatureProcessor, "process_pixel_columns")
+    @patch.object(SerialConnection, "read_line")
+    def test_capture_once_regex_parser_without_numba(self, mock_read_line, mock_process):
+        """Prueba que sin numba las líneas de píxel se analizan con la expresión regular."""
+        mock_read_line.side_effect = [b"START_SAVING:TEST123", b"DIM:2,2", b"0,0,F800", b"1,1,07e0", b"END_SAVING"]
+        self.capture._capture_once()
+        width, height, xs, ys, colors, serial_number = mock_process.call_args[0]
+        self.assertEqual((list(xs), list(ys), list(colors)), ([0, 1], [0, 1], [0xF800, 0x07E0]))
+
+    def test_parse_pixel_block(self):
+        """Prueba el analizador de bloques (versión Python de la función compilada con numba)."""
+        block = np.frombuffer(b"0,0,F800\n12,3,07e0\n99,100,1F", dtype=np.uint8)
+        parsed = np.zeros((3, 3), dtype=np.uint16)
+        self.assertEqual(_parse_pixel_block(block, parsed[0], parsed[1], parsed[2]), -1)
+        self.assertEqual(parsed.tolist(), [[0, 12, 99], [0, 3, 100], [0xF800, 0x07E0, 0x1F]])
+        for bad_block in (b"0,0,F800\n0,0", b"0,0,F800\n0,0,G1", b"0,0,F800\n70000,0,1"):
+            block = np.frombuffer(bad_block, dtype=np.uint8)
+            self.assertEqual(_parse_pixel_block(block, parsed[0], parsed[1], parsed[2]), 1)
+
+    @patch.object(SerialConnection, "read_line")
+    def test_capture_once_negative_pixel(self, mock_read_line):
+        """Prueba que una coordenada negativa se rechaza como dato inválido."""
+        mock_read_line.side_effect = [b"START_SAVING:TEST123", b"DIM:1,1", b"-1,0,F800", b"END_SAVING"]
+        with self.assertRaises(InvalidDataError):
+            self.capture._capture_once()
+
+    @patch.object(SerialConnection, "read_line")
+    def test_capture_once_invalid_pixel_line(self, mock_read_line):
+        """Prueba que una línea de píxel mal formada se rechaza como dato inválido."""
+        mock_read_line.side_effect = [b"START_SAVING:TEST123", b"DIM:2,2", b"0,0,F800", b"0,0", b"END_SAVING"]
+        with self.assertRaisesRegex(InvalidDataError, "'0,0'"):
+            self.capture._capture_once()
+
+    @patch.object(SignatureProcessor, "process_pixel_columns")
+    @patch.object(SerialConnection, "read_bytes")
+    @patch.object(SerialConnection, "read_line")
+    def test_capture_once_binary_block(self, mock_read_line, mock_read_bytes, mock_process):
+        """Prueba que un bloque BIN:<n> se lee de una sola vez y se decodifica."""
+        mock_read_line.side_effect = [
+            b"START_SAVING:TEST123",
+            b"DIM:2,2",
+            b"BIN:2",
+            b"END_SAVING"
+        ]
+        mock_read_bytes.return_value = struct.pack("<6H", 0, 0, 0xF800, 1, 1, 0x07E0)
+        self.capture._capture_once()
+        mock_read_bytes.assert_called_once_with(12, timeout=10)
+        width, height, xs, ys, colors, serial_number = mock_process.call_args[0]
+        self.assertEqual((width, height, serial_number), (2, 2, "TEST123"))
+        self.assertEqual((list(xs), list(ys), list(colors)), ([0, 1], [0, 1], [0xF800, 0x07E0]))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file